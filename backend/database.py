@@ -1,16 +1,30 @@
-from sqlalchemy import create_engine, Column, String, DateTime, Text, ARRAY
+from sqlalchemy import create_engine, event, Column, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 import os
 
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./database.db")
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+if DATABASE_URL.startswith("sqlite"):
+    # Keep the default QueuePool rather than StaticPool: sessions run on
+    # several threads at once and must not share a single connection
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run alongside a writer, and NORMAL only fsyncs at
+        # checkpoints instead of on every commit
+        # WAL keeps -wal/-shm files beside the database, so every process
+        # sharing it must mount the containing directory, not just the file
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+else:
+    engine = create_engine(DATABASE_URL, pool_size=20, max_overflow=40, pool_pre_ping=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -18,14 +32,40 @@ Base = declarative_base()
 
 class CallRecord(Base):
     __tablename__ = "calls"
+    __table_args__ = (
+        # Serves ORDER BY upload_timestamp, id + LIMIT in either direction
+        Index("ix_calls_upload_timestamp_id", "upload_timestamp", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     filename = Column(String, nullable=False)
     upload_timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     transcript = Column(Text, default="")
     summary = Column(Text, default="")
-    tags = Column(Text, default="[]")  # Stored as JSON string for SQLite compatibility
-    file_hash = Column(String, nullable=True, index=True) 
+    file_hash = Column(String, nullable=True, unique=True, index=True)
+    status = Column(String, default="pending", nullable=False)  # pending, processing, completed, failed
+
+    tags_rel = relationship(
+        "CallTag",
+        back_populates="call",
+        cascade="all, delete-orphan",
+        order_by="CallTag.tag",
+        lazy="selectin",  # one extra query per result set instead of one per call
+    )
+    # Plain list of tag names backed by the call_tags table
+    tags = association_proxy("tags_rel", "tag", creator=lambda tag: CallTag(tag=tag))
+
+
+class CallTag(Base):
+    __tablename__ = "call_tags"
+    __table_args__ = (
+        Index("ix_call_tags_tag_call", "tag", "call_id"),
+    )
+
+    call_id = Column(String, ForeignKey("calls.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String, primary_key=True)
+
+    call = relationship("CallRecord", back_populates="tags_rel")
 
 
 def init_db():
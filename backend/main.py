@@ -2,7 +2,31 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from database import init_db
 from routes import calls
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import logging
 import os
+import queue
+
+
+def configure_logging():
+    """
+    Send application logs through a queue so request handlers never block on
+    the output stream; a background listener thread does the actual writing
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    app_logger = logging.getLogger()
+    app_logger.addHandler(QueueHandler(log_queue))
+    app_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+configure_logging()
 
 app = FastAPI(
     title="Altur Homework API",
@@ -0,0 +1,31 @@
+"""add processing status to calls
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("calls")}
+    if "status" in columns:
+        return
+
+    # Calls uploaded before background processing were analyzed during the upload request
+    with op.batch_alter_table("calls") as batch_op:
+        batch_op.add_column(
+            sa.Column("status", sa.String(), nullable=False, server_default="completed")
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("calls") as batch_op:
+        batch_op.drop_column("status")
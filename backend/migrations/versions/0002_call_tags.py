@@ -0,0 +1,77 @@
+"""move call tags from a JSON column into the call_tags table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+calls = sa.table(
+    "calls",
+    sa.column("id", sa.String),
+    sa.column("tags", sa.Text),
+)
+
+call_tags = sa.table(
+    "call_tags",
+    sa.column("call_id", sa.String),
+    sa.column("tag", sa.String),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # init_db() may already have created the (empty) table on startup
+    if "call_tags" not in inspector.get_table_names():
+        op.create_table(
+            "call_tags",
+            sa.Column("call_id", sa.String(), sa.ForeignKey("calls.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("tag", sa.String(), primary_key=True),
+        )
+        op.create_index("ix_call_tags_tag_call", "call_tags", ["tag", "call_id"])
+
+    columns = {column["name"] for column in inspector.get_columns("calls")}
+    if "tags" not in columns:
+        return
+
+    existing = set(bind.execute(sa.select(call_tags.c.call_id, call_tags.c.tag)).all())
+    rows = []
+    for call_id, raw_tags in bind.execute(sa.select(calls.c.id, calls.c.tags)):
+        try:
+            tags = json.loads(raw_tags) if raw_tags else []
+        except json.JSONDecodeError:
+            continue
+        for tag in dict.fromkeys(str(tag) for tag in tags):
+            if (call_id, tag) not in existing:
+                rows.append({"call_id": call_id, "tag": tag})
+    if rows:
+        op.bulk_insert(call_tags, rows)
+
+    with op.batch_alter_table("calls") as batch_op:
+        batch_op.drop_column("tags")
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    with op.batch_alter_table("calls") as batch_op:
+        batch_op.add_column(sa.Column("tags", sa.Text(), server_default="[]"))
+
+    tags_by_call = {}
+    for call_id, tag in bind.execute(sa.select(call_tags.c.call_id, call_tags.c.tag)):
+        tags_by_call.setdefault(call_id, []).append(tag)
+    for call_id, tags in tags_by_call.items():
+        bind.execute(calls.update().where(calls.c.id == call_id).values(tags=json.dumps(tags)))
+
+    op.drop_index("ix_call_tags_tag_call", table_name="call_tags")
+    op.drop_table("call_tags")
@@ -0,0 +1,32 @@
+"""make calls.file_hash unique
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    indexes = {index["name"]: index for index in sa.inspect(op.get_bind()).get_indexes("calls")}
+    existing = indexes.get("ix_calls_file_hash")
+    if existing and existing["unique"]:
+        return
+
+    with op.batch_alter_table("calls") as batch_op:
+        if existing:
+            batch_op.drop_index("ix_calls_file_hash")
+        batch_op.create_index("ix_calls_file_hash", ["file_hash"], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table("calls") as batch_op:
+        batch_op.drop_index("ix_calls_file_hash")
+        batch_op.create_index("ix_calls_file_hash", ["file_hash"], unique=False)
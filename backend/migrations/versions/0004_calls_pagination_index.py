@@ -0,0 +1,24 @@
+"""index calls by (upload_timestamp, id) for keyset pagination
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    indexes = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("calls")}
+    if "ix_calls_upload_timestamp_id" not in indexes:
+        op.create_index("ix_calls_upload_timestamp_id", "calls", ["upload_timestamp", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_calls_upload_timestamp_id", table_name="calls")
@@ -1,25 +1,43 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import datetime
 from typing import List, Optional
 
 
-class CallRecordBase(BaseModel):
+def _none_as_empty(value):
+    return value or ""
+
+
+class CallRecordSummaryResponse(BaseModel):
+    """Call record without the transcript, used by list views"""
+    id: str
     filename: str
-    transcript: str = ""
+    upload_timestamp: datetime
     summary: str = ""
     tags: List[str] = []
+    status: str = "pending"
 
+    class Config:
+        from_attributes = True
 
-class CallRecordCreate(CallRecordBase):
-    pass
+    @field_validator("summary", mode="before")
+    @classmethod
+    def _summary_none_as_empty(cls, value):
+        return _none_as_empty(value)
 
+    @field_validator("tags", mode="before")
+    @classmethod
+    def _tags_as_list(cls, value):
+        # ORM records expose tags through an association proxy, not a list
+        return list(value or [])
 
-class CallRecordResponse(CallRecordBase):
-    id: str
-    upload_timestamp: datetime
 
-    class Config:
-        from_attributes = True
+class CallRecordResponse(CallRecordSummaryResponse):
+    transcript: str = ""
+
+    @field_validator("transcript", mode="before")
+    @classmethod
+    def _transcript_none_as_empty(cls, value):
+        return _none_as_empty(value)
 
 
 class UploadResponse(BaseModel):
@@ -27,9 +45,15 @@ class UploadResponse(BaseModel):
     message: str
 
 
+class CallStatusResponse(BaseModel):
+    id: str
+    status: str
+
+
 class CallsListResponse(BaseModel):
-    calls: List[CallRecordResponse]
-    total: int
+    calls: List[CallRecordSummaryResponse]
+    count: int  # Calls on this page, not across all pages
+    next_cursor: Optional[str] = None
 
 
 class TagRequest(BaseModel):
@@ -1,51 +1,58 @@
 import os
-import json
 import uuid
+import asyncio
+import base64
 import hashlib
-import io
+import logging
 from datetime import datetime
 from typing import Optional, List
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query, Request, Response
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
-import aiofiles
-from pydub import AudioSegment
-from database import get_db, CallRecord as DBCallRecord
-from models import CallRecordResponse, UploadResponse, CallsListResponse, TagRequest
-from services.stt_service import STTService
-from services.llm_service import LLMService
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import desc, asc, and_, or_
+from sqlalchemy.exc import IntegrityError
+from pydantic import TypeAdapter
+from database import get_db, CallRecord as DBCallRecord, CallTag
+from models import CallRecordResponse, CallRecordSummaryResponse, UploadResponse, CallsListResponse, CallStatusResponse, TagRequest
+from worker import process_call
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/calls", tags=["calls"])
 
-# Initialize services (lazy initialization)
-stt_service = None
-llm_service = None
+UPLOAD_DIR = "uploads"
+os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # 50MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+AUDIO_CACHE_CONTROL = "private, max-age=86400"
 
-def get_stt_service():
-    """Get or initialize STT service"""
-    global stt_service
-    if stt_service is None:
-        try:
-            stt_service = STTService()
-        except ValueError as e:
-            raise HTTPException(status_code=500, detail=f"STT service not available: {str(e)}")
-    return stt_service
+# Validates a whole page of ORM rows in one call
+_call_summaries = TypeAdapter(List[CallRecordSummaryResponse])
 
 
-def get_llm_service():
-    """Get or initialize LLM service"""
-    global llm_service
-    if llm_service is None:
-        try:
-            llm_service = LLMService()
-        except ValueError as e:
-            raise HTTPException(status_code=500, detail=f"LLM service not available: {str(e)}")
-    return llm_service
+def _encode_cursor(db_call: DBCallRecord) -> str:
+    """Opaque keyset cursor pointing just past the given call"""
+    raw = f"{db_call.upload_timestamp.isoformat()}|{db_call.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, call_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), call_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _hash_and_write_chunk(f, hasher, chunk: bytes):
+    """
+    Hash and write one upload chunk in a single pass; runs in a worker thread
+    so neither the hashing nor the disk write blocks the event loop
+    """
+    hasher.update(chunk)
+    f.write(chunk)
 
 
 @router.post("/upload", response_model=UploadResponse)
@@ -67,100 +74,87 @@ async def upload_audio_file(
         )
 
 
-    file_content = await file.read()
-    file_size = len(file_content)
-    max_size = 50 * 1024 * 1024  # 50MB
-    
-    if file_size > max_size:
+    if file.size is not None and file.size > MAX_UPLOAD_SIZE:
         raise HTTPException(
-            status_code=400,
+            status_code=413,
             detail="File size exceeds 50MB limit"
         )
 
-    if file_size == 0:
-        raise HTTPException(
-            status_code=400,
-            detail="File is empty"
-        )
-
-
-    file_hash = hashlib.sha256(file_content).hexdigest()
-    
-
-    existing_call = db.query(DBCallRecord).filter(DBCallRecord.file_hash == file_hash).first()
-    if existing_call:
-        raise HTTPException(
-            status_code=409,
-            detail=f"Duplicate file detected. This file was already uploaded as '{existing_call.filename}' on {existing_call.upload_timestamp.isoformat()}"
-        )
+    # Generate unique ID for the call
+    call_id = str(uuid.uuid4())
 
-    
-    stored_filename = file.filename
-    if file_extension == ".wav":
-        try:
-            audio_segment = AudioSegment.from_file(io.BytesIO(file_content), format="wav")
-            mp3_buffer = io.BytesIO()
-            audio_segment.export(mp3_buffer, format="mp3", bitrate="96k")
-            file_content = mp3_buffer.getvalue()
-            file_extension = ".mp3"
-            stored_filename = f"{os.path.splitext(file.filename)[0]}.mp3"
-        except Exception as e:
+    # Stream the upload to disk in chunks, hashing as we go, so the whole
+    # file is never held in memory
+    temp_path = os.path.join(UPLOAD_DIR, f"{call_id}.part")
+    hasher = hashlib.sha256()
+    file_size = 0
+    try:
+        with open(temp_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail="File size exceeds 50MB limit"
+                    )
+                await asyncio.to_thread(_hash_and_write_chunk, f, hasher, chunk)
+
+        if file_size == 0:
             raise HTTPException(
-                status_code=500,
-                detail=f"Failed to convert WAV to MP3: {str(e)}"
+                status_code=400,
+                detail="File is empty"
             )
 
-    # Generate unique ID for the call
-    call_id = str(uuid.uuid4())
-    
-   
-    file_path = os.path.join(UPLOAD_DIR, f"{call_id}{file_extension}")
-    async with aiofiles.open(file_path, "wb") as f:
-        await f.write(file_content)
+        # Stored as uploaded; the worker compresses WAVs after transcription
+        file_path = os.path.join(UPLOAD_DIR, f"{call_id}{file_extension}")
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    file_hash = hasher.hexdigest()
 
     # Create database record
     db_call = DBCallRecord(
         id=call_id,
-        filename=stored_filename,
+        filename=file.filename,
         upload_timestamp=datetime.utcnow(),
         transcript="",
         summary="",
-        tags="[]",
-        file_hash=file_hash
+        file_hash=file_hash,
+        status="pending"
     )
     db.add(db_call)
-    db.commit()
-    db.refresh(db_call)
-
-    # Process audio asynchronously (in a real app, use background tasks)
     try:
-        # Transcribe audio
-        stt = get_stt_service()
-        transcript = await stt.transcribe_audio(file_path)
-        
-        if not transcript:
-            transcript = ""
-            summary = "Transcription failed. Please try again."
-            tags = ["transcription failed"]
-        else:
-            # Analyze with LLM
-            llm = get_llm_service()
-            summary, tags = await llm.analyze_transcript(transcript)
-            
-        # Update database record
-        db_call.transcript = transcript
-        db_call.summary = summary
-        db_call.tags = json.dumps(tags)
         db.commit()
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error processing audio: {e}")
-        # Update with error message
-        db_call.summary = f"Error processing audio: {str(e)}"
-        db_call.tags = json.dumps(["processing error"])
+    except IntegrityError:
+        # The unique index on file_hash rejects duplicates, including concurrent
+        # uploads of the same file, without a separate lookup first
+        db.rollback()
+        os.remove(file_path)
+        existing_call = db.query(DBCallRecord).filter(DBCallRecord.file_hash == file_hash).first()
+        if not existing_call:
+            raise
+        raise HTTPException(
+            status_code=409,
+            detail=f"Duplicate file detected. This file was already uploaded as '{existing_call.filename}' on {existing_call.upload_timestamp.isoformat()}"
+        )
+
+    # Transcription and analysis run in the Celery worker. Publishing talks
+    # to the broker synchronously, so keep it off the event loop
+    try:
+        await asyncio.to_thread(process_call.delay, call_id, file_path)
+    except Exception:
+        # Without a queued task the record would stay pending forever, so
+        # undo the upload and let the client retry
+        logger.exception("Error queueing call %s for processing", call_id)
+        db.delete(db_call)
         db.commit()
+        os.remove(file_path)
+        raise HTTPException(
+            status_code=503,
+            detail="Processing queue unavailable. Please try again later."
+        )
 
     return UploadResponse(
         id=call_id,
@@ -173,20 +167,10 @@ async def get_available_tags(db: Session = Depends(get_db)):
     """
     Get all available tags from all calls
     """
-    db_calls = db.query(DBCallRecord).all()
-    
-    all_tags = set()
-    print(db_calls)
-
-    for db_call in db_calls:
-        if db_call.tags:
-            try:
-                tags_list = json.loads(db_call.tags)
-                all_tags.update(tags_list)
-            except:
-                pass
-    
-    return sorted(list(all_tags))
+    tag_rows = db.query(CallTag.tag).distinct().order_by(CallTag.tag).all()
+    logger.debug("available_tags rows=%d", len(tag_rows))
+
+    return [tag for (tag,) in tag_rows]
 
 
 
@@ -194,39 +178,51 @@ async def get_available_tags(db: Session = Depends(get_db)):
 async def get_calls(
     tag: Optional[str] = Query(None, description="Filter by tag"),
     sort: Optional[str] = Query("newest", description="Sort order: newest or oldest"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of calls to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
     """
-    Get all calls with optional filtering by tag and sorting
+    Get a page of calls with optional filtering by tag and sorting
     """
-    query = db.query(DBCallRecord)
+    # The list view never shows transcripts, so don't fetch them
+    query = db.query(DBCallRecord).options(defer(DBCallRecord.transcript, raiseload=True))
     
     # Filter by tag if provided
     if tag:
-        query = query.filter(DBCallRecord.tags.contains(f'"{tag}"'))
+        query = query.join(CallTag).filter(CallTag.tag == tag)
     
-    # Sort by upload timestamp
-    if sort == "oldest":
-        query = query.order_by(asc(DBCallRecord.upload_timestamp))
+    # Sort by upload timestamp, with the id as a tie-breaker so pages are stable
+    oldest_first = sort == "oldest"
+    if oldest_first:
+        query = query.order_by(asc(DBCallRecord.upload_timestamp), asc(DBCallRecord.id))
     else:  # newest (default)
-        query = query.order_by(desc(DBCallRecord.upload_timestamp))
-    
-    db_calls = query.all()
-    
-    # Convert to response models
-    calls = []
-    for db_call in db_calls:
-        tags_list = json.loads(db_call.tags) if db_call.tags else []
-        calls.append(CallRecordResponse(
-            id=db_call.id,
-            filename=db_call.filename,
-            upload_timestamp=db_call.upload_timestamp,
-            transcript=db_call.transcript or "",
-            summary=db_call.summary or "",
-            tags=tags_list
-        ))
+        query = query.order_by(desc(DBCallRecord.upload_timestamp), desc(DBCallRecord.id))
+
+    # Keyset pagination: continue strictly after the last call of the previous page
+    if cursor:
+        cursor_timestamp, cursor_id = _decode_cursor(cursor)
+        if oldest_first:
+            query = query.filter(or_(
+                DBCallRecord.upload_timestamp > cursor_timestamp,
+                and_(DBCallRecord.upload_timestamp == cursor_timestamp, DBCallRecord.id > cursor_id)
+            ))
+        else:
+            query = query.filter(or_(
+                DBCallRecord.upload_timestamp < cursor_timestamp,
+                and_(DBCallRecord.upload_timestamp == cursor_timestamp, DBCallRecord.id < cursor_id)
+            ))
+
+    # Fetch one extra row to know whether another page exists
+    db_calls = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(db_calls) > limit:
+        db_calls = db_calls[:limit]
+        next_cursor = _encode_cursor(db_calls[-1])
     
-    return CallsListResponse(calls=calls, total=len(calls))
+    calls = _call_summaries.validate_python(db_calls, from_attributes=True)
+
+    return CallsListResponse(calls=calls, count=len(calls), next_cursor=next_cursor)
 
 
 @router.get("/{call_id}", response_model=CallRecordResponse)
@@ -242,16 +238,23 @@ async def get_call_by_id(
     if not db_call:
         raise HTTPException(status_code=404, detail="Call not found")
     
-    tags_list = json.loads(db_call.tags) if db_call.tags else []
-    
-    return CallRecordResponse(
-        id=db_call.id,
-        filename=db_call.filename,
-        upload_timestamp=db_call.upload_timestamp,
-        transcript=db_call.transcript or "",
-        summary=db_call.summary or "",
-        tags=tags_list
-    )
+    return CallRecordResponse.model_validate(db_call)
+
+
+@router.get("/{call_id}/status", response_model=CallStatusResponse)
+async def get_call_status(
+    call_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the processing status of a call
+    """
+    db_call = db.query(DBCallRecord).filter(DBCallRecord.id == call_id).first()
+
+    if not db_call:
+        raise HTTPException(status_code=404, detail="Call not found")
+
+    return CallStatusResponse(id=db_call.id, status=db_call.status)
 
 
 @router.post("/{call_id}/tags", response_model=CallRecordResponse)
@@ -272,21 +275,12 @@ async def add_call_tag(
     if not tag_value:
         raise HTTPException(status_code=400, detail="Tag cannot be empty")
 
-    tags_list = json.loads(db_call.tags) if db_call.tags else []
-    if tag_value not in tags_list:
-        tags_list.append(tag_value)
-        db_call.tags = json.dumps(tags_list)
+    if tag_value not in db_call.tags:
+        db_call.tags.append(tag_value)
         db.commit()
         db.refresh(db_call)
 
-    return CallRecordResponse(
-        id=db_call.id,
-        filename=db_call.filename,
-        upload_timestamp=db_call.upload_timestamp,
-        transcript=db_call.transcript or "",
-        summary=db_call.summary or "",
-        tags=tags_list
-    )
+    return CallRecordResponse.model_validate(db_call)
 
 
 @router.delete("/{call_id}/tags", response_model=CallRecordResponse)
@@ -307,26 +301,18 @@ async def remove_call_tag(
     if not tag_value:
         raise HTTPException(status_code=400, detail="Tag cannot be empty")
 
-    tags_list = json.loads(db_call.tags) if db_call.tags else []
-    if tag_value in tags_list:
-        tags_list = [t for t in tags_list if t != tag_value]
-        db_call.tags = json.dumps(tags_list)
+    if tag_value in db_call.tags:
+        db_call.tags.remove(tag_value)
         db.commit()
         db.refresh(db_call)
 
-    return CallRecordResponse(
-        id=db_call.id,
-        filename=db_call.filename,
-        upload_timestamp=db_call.upload_timestamp,
-        transcript=db_call.transcript or "",
-        summary=db_call.summary or "",
-        tags=tags_list
-    )
+    return CallRecordResponse.model_validate(db_call)
 
 
 @router.get("/{call_id}/audio")
 async def get_call_audio(
     call_id: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
@@ -356,10 +342,22 @@ async def get_call_audio(
     
     # Determine media type
     media_type = "audio/mpeg" if file_extension == ".mp3" else "audio/wav"
-    
+
+    headers = {"Cache-Control": AUDIO_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if db_call.file_hash:
+        # The stored file changes when a WAV is compressed to MP3, so the
+        # extension is part of the validator alongside the upload hash
+        etag = f'"{db_call.file_hash}{file_extension}"'
+        headers["ETag"] = etag
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+    # FileResponse serves Range requests as 206 partial content
     return FileResponse(
         path=file_path,
         media_type=media_type,
-        filename=db_call.filename
+        filename=db_call.filename,
+        headers=headers
     )
 
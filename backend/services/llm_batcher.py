@@ -0,0 +1,67 @@
+"""
+Micro-batcher that coalesces concurrent LLM requests into a single API call
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+
+class LLMBatcher:
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch: int = 8,
+        max_delay: float = 0.2
+    ):
+        """
+        Args:
+            handler: Coroutine that processes a list of items and returns one result per item, in order
+            max_batch: Maximum number of items sent to the handler at once
+            max_delay: Seconds to wait for more items after the first one arrives
+        """
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item and wait for its result from the next batch
+        """
+        # The queue and drain task belong to the running loop; recreate them if
+        # a previous loop has gone away
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = await self.handler([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f"Expected {len(batch)} results, got {len(results)}")
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -3,8 +3,22 @@ LLM service for analyzing transcripts and generating summaries and tags
 """
 import os
 import json
-from openai import OpenAI
+import asyncio
+import hashlib
+import logging
+import redis
+from redis import asyncio as aioredis
+from openai import AsyncOpenAI
 from typing import List, Optional
+from services.llm_batcher import LLMBatcher
+
+logger = logging.getLogger(__name__)
+
+LLM_MODEL = "gpt-4o-mini"
+
+# Bump whenever the prompt or model changes so stale cached analyses are ignored
+PROMPT_VERSION = "v4"
+CACHE_TTL_SECONDS = 30 * 24 * 60 * 60  # 30 days
 
 
 class LLMService:
@@ -12,7 +26,46 @@ class LLMService:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
-        self.client = OpenAI(api_key=api_key)
+        self.client = AsyncOpenAI(api_key=api_key)
+        self.cache = aioredis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            socket_timeout=1,
+            socket_connect_timeout=1
+        )
+        # Concurrent analyses are coalesced into one API call per batch
+        self.batcher = LLMBatcher(self._analyze_batch, max_batch=8, max_delay=0.2)
+
+    def _cache_key(self, transcript: str) -> str:
+        digest = hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+        return f"llm:{PROMPT_VERSION}:{digest}"
+
+    async def _get_cached(self, transcript: str) -> Optional[tuple[str, List[str]]]:
+        """Return a previously stored analysis for this transcript, if any"""
+        try:
+            cached = await self.cache.get(self._cache_key(transcript))
+        except redis.RedisError as e:
+            logger.warning("Error reading LLM cache: %s", e)
+            return None
+        if cached is None:
+            return None
+        try:
+            result = json.loads(cached)
+            return result["summary"], result["tags"]
+        except (ValueError, KeyError, TypeError) as e:
+            # A corrupt entry is a miss; the fresh analysis overwrites it
+            logger.warning("Ignoring corrupt LLM cache entry: %s", e)
+            return None
+
+    async def _set_cached(self, transcript: str, summary: str, tags: List[str]):
+        """Store an analysis so identical transcripts skip the API call"""
+        try:
+            await self.cache.set(
+                self._cache_key(transcript),
+                json.dumps({"summary": summary, "tags": tags}),
+                ex=CACHE_TTL_SECONDS
+            )
+        except redis.RedisError as e:
+            logger.warning("Error writing LLM cache: %s", e)
 
     async def analyze_transcript(self, transcript: str) -> tuple[str, List[str]]:
         """
@@ -23,67 +76,110 @@ class LLMService:
             
         Returns:
             Tuple of (summary, tags_list)
+
+        Raises:
+            openai.OpenAIError or ValueError if the API call or response parsing fails
         """
         if not transcript or len(transcript.strip()) == 0:
             return "No transcript available.", []
 
-        prompt = f"""Analyze the following call transcript and provide:
+        cached = await self._get_cached(transcript)
+        if cached is not None:
+            return cached
+
+        summary, tags = await self.batcher.submit(transcript)
+
+        await self._set_cached(transcript, summary, tags)
+        return summary, tags
+
+    async def _analyze_batch(self, transcripts: List[str]) -> List[tuple[str, List[str]]]:
+        """
+        Analyze several transcripts with a single chat completion
+
+        Args:
+            transcripts: The transcript texts to analyze
+
+        Returns:
+            One (summary, tags_list) tuple per transcript, in the same order
+
+        Raises:
+            ValueError: If a lone transcript gets no usable result
+        """
+        numbered = "\n\n".join(
+            f"Transcript {index}:\n{transcript}"
+            for index, transcript in enumerate(transcripts, start=1)
+        )
+
+        prompt = f"""Analyze each of the following call transcripts and provide, for each one:
 1. A concise summary (2-3 sentences) of the call
 2. A list of relevant tags from these categories: "client wants to buy", "wrong number", "needs follow-up", "voicemail", "complaint", "inquiry", "support request", "sale completed", "appointment scheduled"
 
-Transcript:
-{transcript}
+{numbered}
 
-Respond in JSON format with this structure:
+Respond with a JSON object with this structure, containing exactly one result per transcript, where "index" is the number of the transcript it describes:
 {{
-    "summary": "Your summary here",
-    "tags": ["tag1", "tag2", "tag3"]
+    "results": [
+        {{
+            "index": 1,
+            "summary": "Your summary here",
+            "tags": ["tag1", "tag2", "tag3"]
+        }}
+    ]
 }}"""
 
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that analyzes call transcripts and extracts key information."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
+        # JSON mode guarantees the reply is a single valid JSON object; any
+        # API or parsing error propagates so the caller can record it
+        response = await self.client.chat.completions.create(
+            model=LLM_MODEL,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that analyzes call transcripts and extracts key information."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.7,
+            max_tokens=500 * len(transcripts)
+        )
 
-            content = response.choices[0].message.content.strip()
-            
-            
-            try:
-               
-                if content.startswith("```"):
-                    content = content.split("```")[1]
-                    if content.startswith("json"):
-                        content = content[4:]
-                content = content.strip()
-                
-                result = json.loads(content)
-                summary = result.get("summary", "Summary not available.")
-                tags = result.get("tags", [])
-                
-                # Ensure tags is a list
-                if isinstance(tags, str):
-                    tags = [tags]
-                elif not isinstance(tags, list):
-                    tags = []
-                    
-                return summary, tags
-            except json.JSONDecodeError:
-                lines = content.split("\n")
-                summary = lines[0] if lines else "Summary not available."
+        reply = json.loads(response.choices[0].message.content)
+        results = reply.get("results") if isinstance(reply, dict) else None
+        if not isinstance(results, list):
+            results = []
+
+        # Match results to transcripts by their index rather than position so
+        # one call's analysis can never be stored on another call
+        analyses = {}
+        duplicates = set()
+        for result in results:
+            if not isinstance(result, dict):
+                continue
+            index = result.get("index")
+            if not isinstance(index, int) or isinstance(index, bool) or not 1 <= index <= len(transcripts):
+                continue
+            if index in analyses:
+                duplicates.add(index)
+                continue
+
+            summary = result.get("summary", "Summary not available.")
+            tags = result.get("tags", [])
+
+            # Ensure tags is a list
+            if isinstance(tags, str):
+                tags = [tags]
+            elif not isinstance(tags, list):
                 tags = []
-                for line in lines:
-                    if "tag" in line.lower():
-                        pass
-                return summary, ["needs follow-up"]
-                
-        except Exception as e:
-            print(f"Error analyzing transcript with LLM: {e}")
-          
-            return f"Transcript analyzed. ({len(transcript)} characters)", ["needs follow-up"]
 
+            analyses[index] = (summary, tags)
+
+        # Ambiguous results are discarded along with the missing ones, and
+        # those transcripts are analyzed again on their own
+        for index in duplicates:
+            del analyses[index]
+        missing = [index for index in range(1, len(transcripts) + 1) if index not in analyses]
+        if missing:
+            if len(transcripts) == 1:
+                raise ValueError("LLM response has no result for the transcript")
+            retried = await asyncio.gather(*(self._analyze_batch([transcripts[index - 1]]) for index in missing))
+            for index, (analysis,) in zip(missing, retried):
+                analyses[index] = analysis
+
+        return [analyses[index] for index in range(1, len(transcripts) + 1)]
@@ -2,18 +2,24 @@
 Speech-to-Text service using OpenAI Whisper API
 """
 import os
-from openai import OpenAI
+import logging
+import aiofiles
+from openai import AsyncOpenAI
 from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
 class STTService:
     def __init__(self):
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
-        self.client = OpenAI(api_key=api_key)
+        # One async client per service; it pools connections across requests
+        self.client = AsyncOpenAI(api_key=api_key)
 
     async def transcribe_audio(self, file_path: str) -> Optional[str]:
         """
@@ -26,14 +32,16 @@ class STTService:
             Transcript text or None if transcription fails
         """
         try:
-            with open(file_path, "rb") as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text"
-                )
-                return transcript if isinstance(transcript, str) else str(transcript)
-        except Exception as e:
-            print(f"Error transcribing audio: {e}")
+            async with aiofiles.open(file_path, "rb") as audio_file:
+                audio_data = await audio_file.read()
+
+            transcript = await self.client.audio.transcriptions.create(
+                model="whisper-1",
+                file=(os.path.basename(file_path), audio_data),
+                response_format="text"
+            )
+            return transcript if isinstance(transcript, str) else str(transcript)
+        except Exception:
+            logger.exception("Error transcribing audio %s", file_path)
             return None
 
@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from services.llm_batcher import LLMBatcher
+
+
+def test_concurrent_submissions_are_batched():
+    """Test that concurrent items are handled in as few batches as possible"""
+    batches = []
+
+    async def handler(items):
+        batches.append(items)
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = LLMBatcher(handler, max_batch=3, max_delay=0.05)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+    assert [len(batch) for batch in batches] == [3, 2]
+
+
+def test_handler_errors_reach_every_caller():
+    """Test that a failed batch fails each submission in it"""
+    async def handler(items):
+        raise RuntimeError("API unavailable")
+
+    async def run():
+        batcher = LLMBatcher(handler, max_delay=0.01)
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_result_count_mismatch_is_an_error():
+    """Test that a handler returning the wrong number of results is rejected"""
+    async def handler(items):
+        return []
+
+    async def run():
+        batcher = LLMBatcher(handler, max_delay=0.01)
+        return await batcher.submit("a")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import pytest
+import redis
+from types import SimpleNamespace
+from services import llm_service
+from services.llm_service import LLMService
+
+
+def _make_service(monkeypatch, replies):
+    """Build an LLMService whose chat completions return the given result lists in turn"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    service = LLMService()
+    prompts = []
+
+    async def create(**kwargs):
+        prompts.append(kwargs["messages"][-1]["content"])
+        content = json.dumps({"results": replies.pop(0)})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return service, prompts
+
+
+def test_batch_results_matched_by_index(monkeypatch):
+    """Test that results are assigned by index even when the model reorders them"""
+    service, _ = _make_service(monkeypatch, [[
+        {"index": 2, "summary": "second", "tags": ["complaint"]},
+        {"index": 1, "summary": "first", "tags": "inquiry"},
+    ]])
+
+    results = asyncio.run(service._analyze_batch(["a", "b"]))
+
+    assert results == [("first", ["inquiry"]), ("second", ["complaint"])]
+
+
+def test_batch_ambiguous_results_retried_individually(monkeypatch):
+    """Test that duplicated or missing indices are re-analyzed one transcript at a time"""
+    service, prompts = _make_service(monkeypatch, [
+        [
+            {"index": 1, "summary": "first", "tags": []},
+            {"index": 2, "summary": "second?", "tags": []},
+            {"index": 2, "summary": "second again?", "tags": []},
+        ],
+        [{"index": 1, "summary": "second", "tags": []}],
+        [{"index": 1, "summary": "third", "tags": []}],
+    ])
+
+    results = asyncio.run(service._analyze_batch(["a", "b", "c"]))
+
+    assert results == [("first", []), ("second", []), ("third", [])]
+    assert len(prompts) == 3
+    assert "Transcript 1:\nb" in prompts[1]
+    assert "Transcript 1:\nc" in prompts[2]
+
+
+def test_single_transcript_without_result_fails(monkeypatch):
+    """Test that a lone transcript with no matching result raises"""
+    service, _ = _make_service(monkeypatch, [[{"summary": "no index", "tags": []}]])
+
+    with pytest.raises(ValueError):
+        asyncio.run(service._analyze_batch(["a"]))
+
+
+@pytest.mark.parametrize("results", [{"index": 1, "summary": "bad", "tags": []}, ["not a result", 1]])
+def test_batch_malformed_results_retried_individually(monkeypatch, results):
+    """Test that a malformed results payload sends each transcript to the retry path"""
+    service, prompts = _make_service(monkeypatch, [
+        results,
+        [{"index": 1, "summary": "first", "tags": []}],
+        [{"index": 1, "summary": "second", "tags": []}],
+    ])
+
+    assert asyncio.run(service._analyze_batch(["a", "b"])) == [("first", []), ("second", [])]
+    assert len(prompts) == 3
+
+
+class _StubCache:
+    """In-memory stand-in for the async Redis client"""
+
+    def __init__(self, error=None):
+        self.data = {}
+        self.error = error
+
+    async def get(self, key):
+        if self.error:
+            raise self.error
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        if self.error:
+            raise self.error
+        self.data[key] = value
+
+
+def test_cache_miss_stores_analysis(monkeypatch):
+    """Test that a fresh analysis is cached under a key that includes the prompt version"""
+    service, prompts = _make_service(monkeypatch, [[{"index": 1, "summary": "first", "tags": ["inquiry"]}]])
+    service.cache = _StubCache()
+
+    assert asyncio.run(service.analyze_transcript("hello")) == ("first", ["inquiry"])
+
+    assert len(prompts) == 1
+    (key,) = service.cache.data
+    assert key.startswith(f"llm:{llm_service.PROMPT_VERSION}:")
+    assert json.loads(service.cache.data[key]) == {"summary": "first", "tags": ["inquiry"]}
+
+
+def test_cache_hit_skips_api(monkeypatch):
+    """Test that a cached analysis is returned without calling the API"""
+    service, prompts = _make_service(monkeypatch, [])
+    service.cache = _StubCache()
+    service.cache.data[service._cache_key("hello")] = json.dumps({"summary": "cached", "tags": ["voicemail"]})
+
+    assert asyncio.run(service.analyze_transcript("hello")) == ("cached", ["voicemail"])
+    assert prompts == []
+
+
+def test_cache_key_changes_with_prompt_version(monkeypatch):
+    """Test that bumping the prompt version invalidates cached analyses"""
+    service, _ = _make_service(monkeypatch, [])
+    key = service._cache_key("hello")
+    monkeypatch.setattr(llm_service, "PROMPT_VERSION", "other")
+    assert service._cache_key("hello") != key
+
+
+@pytest.mark.parametrize("entry", ["not json", json.dumps({"summary": "no tags"}), json.dumps(["a", "b"])])
+def test_corrupt_cache_entry_is_a_miss(monkeypatch, entry):
+    """Test that an unreadable cache entry is replaced by a fresh analysis"""
+    service, prompts = _make_service(monkeypatch, [[{"index": 1, "summary": "fresh", "tags": []}]])
+    service.cache = _StubCache()
+    key = service._cache_key("hello")
+    service.cache.data[key] = entry
+
+    assert asyncio.run(service.analyze_transcript("hello")) == ("fresh", [])
+    assert len(prompts) == 1
+    assert json.loads(service.cache.data[key]) == {"summary": "fresh", "tags": []}
+
+
+def test_cache_errors_are_a_miss(monkeypatch):
+    """Test that Redis being unavailable doesn't block the analysis"""
+    service, prompts = _make_service(monkeypatch, [[{"index": 1, "summary": "fresh", "tags": []}]])
+    service.cache = _StubCache(error=redis.ConnectionError("redis unavailable"))
+
+    assert asyncio.run(service.analyze_transcript("hello")) == ("fresh", [])
+    assert len(prompts) == 1
@@ -0,0 +1,196 @@
+import os
+import uuid
+import asyncio
+import pytest
+from types import SimpleNamespace
+from database import Base, engine, SessionLocal, CallRecord
+import worker
+
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def make_call(tmp_path):
+    """Insert pending calls with audio on disk and remove them after the test"""
+    db = SessionLocal()
+    call_ids = []
+
+    def make(extension):
+        call_id = str(uuid.uuid4())
+        file_path = tmp_path / f"{call_id}{extension}"
+        file_path.write_bytes(uuid.uuid4().bytes)
+        db.add(CallRecord(id=call_id, filename=f"call{extension}", status="pending"))
+        db.commit()
+        call_ids.append(call_id)
+        return call_id, str(file_path)
+
+    yield make
+    for db_call in db.query(CallRecord).filter(CallRecord.id.in_(call_ids)).all():
+        db.delete(db_call)
+    db.commit()
+    db.close()
+
+
+@pytest.fixture
+def pending_call(make_call):
+    return make_call(".mp3")
+
+
+@pytest.fixture
+def wav_call(make_call):
+    return make_call(".wav")
+
+
+def _fetch_call(call_id):
+    db = SessionLocal()
+    try:
+        db_call = db.query(CallRecord).filter(CallRecord.id == call_id).first()
+        return db_call.status, db_call.summary, list(db_call.tags)
+    finally:
+        db.close()
+
+
+def _fetch_filename(call_id):
+    db = SessionLocal()
+    try:
+        return db.query(CallRecord).filter(CallRecord.id == call_id).first().filename
+    finally:
+        db.close()
+
+
+def _stub_services(monkeypatch, transcript, summary="Summary", tags=("inquiry",)):
+    async def transcribe_audio(file_path):
+        return transcript
+
+    async def analyze_transcript(text):
+        return summary, list(tags)
+
+    monkeypatch.setattr(worker, "get_stt_service", lambda: SimpleNamespace(transcribe_audio=transcribe_audio))
+    monkeypatch.setattr(worker, "get_llm_service", lambda: SimpleNamespace(analyze_transcript=analyze_transcript))
+
+
+def test_process_call_completes(monkeypatch, pending_call):
+    """Test a transcribed call is analyzed and marked completed"""
+    _stub_services(monkeypatch, "Hello, I have a question")
+    call_id, file_path = pending_call
+
+    worker.process_call(call_id, file_path)
+
+    assert _fetch_call(call_id) == ("completed", "Summary", ["inquiry"])
+
+
+def test_process_call_transcription_failure(monkeypatch, pending_call):
+    """Test a call whose transcription fails is marked failed"""
+    _stub_services(monkeypatch, None)
+    call_id, file_path = pending_call
+
+    worker.process_call(call_id, file_path)
+
+    status, summary, tags = _fetch_call(call_id)
+    assert status == "failed"
+    assert summary == "Transcription failed. Please try again."
+    assert tags == ["transcription failed"]
+
+
+def test_process_call_skips_finished_call(monkeypatch, pending_call):
+    """Test a redelivered task leaves an already processed call alone"""
+    _stub_services(monkeypatch, "Hello, I have a question")
+    call_id, file_path = pending_call
+    worker.process_call(call_id, file_path)
+
+    _stub_services(monkeypatch, "Something else", summary="Other summary")
+    worker.process_call(call_id, file_path)
+
+    assert _fetch_call(call_id) == ("completed", "Summary", ["inquiry"])
+
+
+def test_process_call_follows_compressed_file(monkeypatch, pending_call):
+    """Test a task queued with the original WAV path processes the stored MP3"""
+    transcribed = []
+
+    async def transcribe_audio(file_path):
+        transcribed.append(file_path)
+        return "Hello"
+
+    _stub_services(monkeypatch, "Hello")
+    monkeypatch.setattr(worker, "get_stt_service", lambda: SimpleNamespace(transcribe_audio=transcribe_audio))
+    call_id, file_path = pending_call
+
+    worker.process_call(call_id, file_path.replace(".mp3", ".wav"))
+
+    assert transcribed == [file_path]
+    assert _fetch_call(call_id)[0] == "completed"
+
+
+def test_process_call_missing_file(monkeypatch, pending_call):
+    """Test a call whose audio file is gone is marked failed instead of left processing"""
+    _stub_services(monkeypatch, "Hello")
+    call_id, file_path = pending_call
+    db = SessionLocal()
+    db.query(CallRecord).filter(CallRecord.id == call_id).update({"filename": "call.wav"})
+    db.commit()
+    db.close()
+
+    worker.process_call(call_id, file_path.replace(".mp3", ".wav"))
+
+    status, summary, tags = _fetch_call(call_id)
+    assert status == "failed"
+    assert tags == ["processing error"]
+
+
+def test_process_call_compresses_wav(monkeypatch, wav_call):
+    """Test a WAV is replaced by an MP3 once the call is processed"""
+    async def transcode(source_path, target_path):
+        with open(target_path, "wb") as f:
+            f.write(b"ID3")
+
+    _stub_services(monkeypatch, "Hello")
+    monkeypatch.setattr(worker, "_transcode_wav_to_mp3", transcode)
+    call_id, file_path = wav_call
+
+    worker.process_call(call_id, file_path)
+
+    mp3_path = file_path.replace(".wav", ".mp3")
+    assert not os.path.exists(file_path)
+    assert os.path.exists(mp3_path)
+    assert _fetch_filename(call_id) == "call.mp3"
+    assert _fetch_call(call_id)[0] == "completed"
+
+
+def test_process_call_keeps_wav_when_compression_fails(monkeypatch, wav_call):
+    """Test a failed transcode leaves the WAV and its filename untouched"""
+    async def transcode(source_path, target_path):
+        with open(target_path, "wb") as f:
+            f.write(b"partial")
+        raise RuntimeError("ffmpeg exited with code 1")
+
+    _stub_services(monkeypatch, "Hello")
+    monkeypatch.setattr(worker, "_transcode_wav_to_mp3", transcode)
+    call_id, file_path = wav_call
+
+    worker.process_call(call_id, file_path)
+
+    assert os.path.exists(file_path)
+    assert not os.path.exists(file_path.replace(".wav", ".mp3"))
+    assert _fetch_filename(call_id) == "call.wav"
+    assert _fetch_call(call_id)[0] == "completed"
+
+
+def test_transcode_raises_on_ffmpeg_error(monkeypatch):
+    """Test a non-zero ffmpeg exit is reported with its stderr"""
+    commands = []
+
+    async def create_subprocess_exec(*args, **kwargs):
+        commands.append(args)
+
+        async def communicate():
+            return b"", b"Invalid data found when processing input"
+
+        return SimpleNamespace(communicate=communicate, returncode=1)
+
+    monkeypatch.setattr(worker.asyncio, "create_subprocess_exec", create_subprocess_exec)
+
+    with pytest.raises(RuntimeError, match="Invalid data found"):
+        asyncio.run(worker._transcode_wav_to_mp3("in.wav", "out.mp3"))
+    assert commands[0][0] == "ffmpeg"
+    assert commands[0][-1] == "out.mp3"
@@ -0,0 +1,190 @@
+"""
+Celery application and background tasks for call processing
+"""
+import os
+import asyncio
+import logging
+import threading
+from functools import lru_cache
+from celery import Celery
+from dotenv import load_dotenv
+from database import SessionLocal, CallRecord as DBCallRecord
+from services.stt_service import STTService
+from services.llm_service import LLMService
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+WHISPER_MAX_FILE_SIZE = 25 * 1024 * 1024  # OpenAI transcription upload limit
+
+celery_app = Celery("calls", broker=REDIS_URL, backend=REDIS_URL)
+celery_app.conf.update(
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+)
+
+# One event loop per worker process, shared by all task threads, so that
+# concurrent tasks multiplex OpenAI requests over the same async clients
+# and batch their LLM requests together
+_event_loop = None
+_event_loop_lock = threading.Lock()
+
+
+def _run_async(coro):
+    """Run a coroutine on the shared event loop and wait for its result"""
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, name="worker-event-loop", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop).result()
+
+
+# Services are created once per worker process on first use. They are only
+# requested from coroutines on the shared event loop, so the first call
+# always happens on a single thread and can't race
+@lru_cache(maxsize=1)
+def get_stt_service() -> STTService:
+    """Get the STT service"""
+    return STTService()
+
+
+@lru_cache(maxsize=1)
+def get_llm_service() -> LLMService:
+    """Get the LLM service"""
+    return LLMService()
+
+
+class TranscriptionError(Exception):
+    """Raised when the STT service returns no transcript"""
+
+
+async def _analyze_audio(file_path: str) -> tuple[str, str, list[str]]:
+    """
+    Transcribe an audio file and analyze the transcript
+
+    Returns:
+        Tuple of (transcript, summary, tags_list)
+
+    Raises:
+        TranscriptionError: If the audio could not be transcribed
+    """
+    stt = get_stt_service()
+    transcript = await stt.transcribe_audio(file_path)
+
+    if not transcript:
+        raise TranscriptionError(file_path)
+
+    llm = get_llm_service()
+    summary, tags = await llm.analyze_transcript(transcript)
+    return transcript, summary, tags
+
+
+def _is_wav(file_path: str) -> bool:
+    return file_path.lower().endswith(".wav")
+
+
+async def _transcode_wav_to_mp3(source_path: str, target_path: str):
+    """Convert a WAV file to a 96 kbps MP3 with a single ffmpeg process"""
+    # ffmpeg reads the source by path, so no probe pass or piping through Python
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-i", source_path,
+        "-codec:a", "libmp3lame", "-b:a", "96k", "-f", "mp3",
+        target_path,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with code {process.returncode}: {stderr.decode(errors='replace').strip()}")
+
+
+def _stored_audio_path(db_call, file_path: str) -> str:
+    """
+    Path of the call's audio as currently stored
+
+    The WAV the task was queued with is replaced by an MP3 once compressed,
+    and the record's filename tracks that, so a redelivered task follows it
+    """
+    extension = os.path.splitext(db_call.filename)[1].lower()
+    return os.path.join(os.path.dirname(file_path), f"{db_call.id}{extension}")
+
+
+def _compress_audio(db, db_call, file_path: str) -> str:
+    """
+    Replace a stored WAV with a smaller MP3
+
+    Returns:
+        Path of the stored audio file (unchanged if compression fails)
+    """
+    mp3_path = f"{os.path.splitext(file_path)[0]}.mp3"
+    try:
+        _run_async(_transcode_wav_to_mp3(file_path, mp3_path))
+        db_call.filename = f"{os.path.splitext(db_call.filename)[0]}.mp3"
+        db.commit()
+    except Exception:
+        logger.exception("Error compressing audio %s", file_path)
+        db.rollback()
+        if os.path.exists(mp3_path):
+            os.remove(mp3_path)
+        return file_path
+
+    os.remove(file_path)
+    return mp3_path
+
+
+@celery_app.task
+def process_call(call_id: str, file_path: str):
+    """
+    Transcribe and analyze an uploaded call, storing the results on its record
+    """
+    db = SessionLocal()
+    try:
+        db_call = db.query(DBCallRecord).filter(DBCallRecord.id == call_id).first()
+        # Late acks mean a task can be delivered again after it already ran
+        if not db_call or db_call.status in ("completed", "failed"):
+            return
+
+        file_path = _stored_audio_path(db_call, file_path)
+        db_call.status = "processing"
+        db.commit()
+
+        try:
+            # Whisper takes WAV directly, so only compress up front when the file
+            # is over the API's size limit; otherwise wait until after transcription
+            if _is_wav(file_path) and os.path.getsize(file_path) > WHISPER_MAX_FILE_SIZE:
+                file_path = _compress_audio(db, db_call, file_path)
+
+            transcript, summary, tags = _run_async(_analyze_audio(file_path))
+
+            db_call.transcript = transcript
+            db_call.summary = summary
+            db_call.tags = list(dict.fromkeys(str(tag) for tag in tags))
+            db_call.status = "completed"
+            db.commit()
+
+        except TranscriptionError:
+            db.rollback()
+            db_call.summary = "Transcription failed. Please try again."
+            db_call.tags = ["transcription failed"]
+            db_call.status = "failed"
+            db.commit()
+
+        except Exception as e:
+            logger.exception("Error processing audio for call %s", call_id)
+            db.rollback()
+            # Update with error message
+            db_call.summary = f"Error processing audio: {str(e)}"
+            db_call.tags = ["processing error"]
+            db_call.status = "failed"
+            db.commit()
+
+        if _is_wav(file_path) and os.path.exists(file_path):
+            _compress_audio(db, db_call, file_path)
+    finally:
+        db.close()
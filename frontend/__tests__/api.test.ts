@@ -1,4 +1,4 @@
-import { uploadAudioFile, getCalls, getCallById, ApiError } from '../lib/api';
+import { uploadAudioFile, getCalls, getCallById, getCallStatus, ApiError } from '../lib/api';
 
 // Mock fetch globally
 global.fetch = jest.fn();
@@ -74,12 +74,11 @@ describe('API Client', () => {
             id: '1',
             filename: 'test.wav',
             upload_timestamp: '2024-01-01T00:00:00Z',
-            transcript: 'Test transcript',
             summary: 'Test summary',
             tags: ['test'],
           },
         ],
-        total: 1,
+        count: 1,
       };
 
       (fetch as jest.Mock).mockResolvedValueOnce({
@@ -99,7 +98,7 @@ describe('API Client', () => {
     });
 
     it('should fetch calls with tag filter and sort', async () => {
-      const mockResponse = { calls: [], total: 0 };
+      const mockResponse = { calls: [], count: 0, next_cursor: null };
 
       (fetch as jest.Mock).mockResolvedValueOnce({
         ok: true,
@@ -117,6 +116,24 @@ describe('API Client', () => {
         expect.any(Object)
       );
     });
+
+    it('should pass pagination parameters', async () => {
+      (fetch as jest.Mock).mockResolvedValueOnce({
+        ok: true,
+        json: async () => ({ calls: [], count: 0, next_cursor: null }),
+        headers: new Headers({ 'content-type': 'application/json' }),
+      });
+
+      await getCalls({ limit: 20, cursor: 'abc123' });
+      expect(fetch).toHaveBeenCalledWith(
+        expect.stringContaining('limit=20'),
+        expect.any(Object)
+      );
+      expect(fetch).toHaveBeenCalledWith(
+        expect.stringContaining('cursor=abc123'),
+        expect.any(Object)
+      );
+    });
   });
 
   describe('getCallById', () => {
@@ -158,5 +175,25 @@ describe('API Client', () => {
       await expect(getCallById('nonexistent')).rejects.toThrow(ApiError);
     });
   });
-});
 
+  describe('getCallStatus', () => {
+    it('should fetch the processing status of a call', async () => {
+      const mockStatus = { id: '123', status: 'processing' };
+
+      (fetch as jest.Mock).mockResolvedValueOnce({
+        ok: true,
+        json: async () => mockStatus,
+        headers: new Headers({ 'content-type': 'application/json' }),
+      });
+
+      const result = await getCallStatus('123');
+      expect(result).toEqual(mockStatus);
+      expect(fetch).toHaveBeenCalledWith(
+        expect.stringContaining('/api/calls/123/status'),
+        expect.objectContaining({
+          method: 'GET',
+        })
+      );
+    });
+  });
+});
@@ -2,7 +2,7 @@
 
 import { useState, useEffect } from 'react';
 import { useParams, useRouter } from 'next/navigation';
-import { getCallById, CallRecord, ApiError, addCallTag, removeCallTag } from '@/lib/api';
+import { getCallById, getCallStatus, CallRecord, ApiError, addCallTag, removeCallTag } from '@/lib/api';
 import AudioPlayer from '@/components/AudioPlayer';
 
 export default function CallDetailPage() {
@@ -24,6 +24,26 @@ export default function CallDetailPage() {
     }
   }, [callId]);
 
+  const isProcessing = call?.status === 'pending' || call?.status === 'processing';
+
+  useEffect(() => {
+    if (!isProcessing) return;
+
+    // Poll until the worker finishes transcription and analysis
+    const interval = setInterval(async () => {
+      try {
+        const { status } = await getCallStatus(callId);
+        if (status === 'completed' || status === 'failed') {
+          setCall(await getCallById(callId));
+        }
+      } catch (err) {
+        console.error('Failed to poll call status:', err);
+      }
+    }, 3000);
+
+    return () => clearInterval(interval);
+  }, [callId, isProcessing]);
+
   const loadCall = async () => {
     setLoading(true);
     setError(null);
@@ -203,6 +223,11 @@ export default function CallDetailPage() {
             <p className="text-xs text-gray-500">
               Uploaded: {formatDate(call.upload_timestamp)}
             </p>
+            {isProcessing && (
+              <p className="text-xs text-gray-500 mt-1">
+                Processing audio... transcript and summary will appear shortly.
+              </p>
+            )}
           </div>
 
           <div className="p-4 space-y-4">
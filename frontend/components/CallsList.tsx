@@ -2,7 +2,7 @@
 
 import { useState, useEffect, useRef } from 'react';
 import { useRouter } from 'next/navigation';
-import { getCalls, getAvailableTags, CallRecord, ApiError, getAudioUrl } from '@/lib/api';
+import { getCalls, getAvailableTags, CallSummary, ApiError, getAudioUrl } from '@/lib/api';
 import CustomSelect from '@/components/CustomSelect';
 import FileUploadButton from '@/components/FileUpload';
 import UploadModal from '@/components/UploadModal';
@@ -14,11 +14,13 @@ interface CallsListProps {
 }
 
 export default function CallsList({ refreshTrigger, onUploadSuccess, onUploadError }: CallsListProps) {
-  const [calls, setCalls] = useState<CallRecord[]>([]);
+  const [calls, setCalls] = useState<CallSummary[]>([]);
   const [availableTags, setAvailableTags] = useState<string[]>([]);
   const [selectedTag, setSelectedTag] = useState<string>('');
   const [sortOrder, setSortOrder] = useState<'newest' | 'oldest'>('newest');
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [isUploadModalOpen, setIsUploadModalOpen] = useState(false);
   const router = useRouter();
@@ -37,6 +39,7 @@ export default function CallsList({ refreshTrigger, onUploadSuccess, onUploadErr
         sort: sortOrder,
       });
       setCalls(response.calls || []);
+      setNextCursor(response.next_cursor ?? null);
     } catch (err) {
       const errorMessage = err instanceof ApiError
         ? err.message
@@ -47,6 +50,28 @@ export default function CallsList({ refreshTrigger, onUploadSuccess, onUploadErr
     }
   };
 
+  const loadMoreCalls = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    setError(null);
+    try {
+      const response = await getCalls({
+        tag: selectedTag || undefined,
+        sort: sortOrder,
+        cursor: nextCursor,
+      });
+      setCalls((prev) => [...prev, ...(response.calls || [])]);
+      setNextCursor(response.next_cursor ?? null);
+    } catch (err) {
+      const errorMessage = err instanceof ApiError
+        ? err.message
+        : 'Failed to load more calls. Please try again.';
+      setError(errorMessage);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const loadTags = async () => {
     try {
       const tags = await getAvailableTags();
@@ -169,6 +194,17 @@ export default function CallsList({ refreshTrigger, onUploadSuccess, onUploadErr
               formatDate={formatDate}
             />
           ))}
+          {nextCursor && (
+            <div className="flex justify-center pt-2">
+              <button
+                onClick={loadMoreCalls}
+                disabled={loadingMore}
+                className="px-4 py-2 text-sm font-medium text-gray-700 bg-gray-100 rounded-lg hover:bg-gray-200 disabled:opacity-50 transition-all active:scale-[0.98]"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -176,7 +212,7 @@ export default function CallsList({ refreshTrigger, onUploadSuccess, onUploadErr
 }
 
 interface CallListItemProps {
-  call: CallRecord;
+  call: CallSummary;
   onCallClick: (callId: string) => void;
   formatDate: (timestamp: string) => string;
 }
@@ -7,6 +7,17 @@ export interface CallRecord {
   transcript: string;
   summary: string;
   tags: string[];
+  status: CallStatus;
+}
+
+// List responses omit the transcript; fetch the call by ID to get it
+export type CallSummary = Omit<CallRecord, 'transcript'>;
+
+export type CallStatus = 'pending' | 'processing' | 'completed' | 'failed';
+
+export interface CallStatusResponse {
+  id: string;
+  status: CallStatus;
 }
 
 export interface UploadResponse {
@@ -15,8 +26,10 @@ export interface UploadResponse {
 }
 
 export interface CallsListResponse {
-  calls: CallRecord[];
-  total: number;
+  calls: CallSummary[];
+  // Calls on this page, not across all pages
+  count: number;
+  next_cursor: string | null;
 }
 
 export class ApiError extends Error {
@@ -83,6 +96,8 @@ export async function uploadAudioFile(file: File): Promise<UploadResponse> {
 export async function getCalls(params?: {
   tag?: string;
   sort?: 'newest' | 'oldest';
+  limit?: number;
+  cursor?: string;
 }): Promise<CallsListResponse> {
   const queryParams = new URLSearchParams();
   if (params?.tag) {
@@ -91,6 +106,12 @@ export async function getCalls(params?: {
   if (params?.sort) {
     queryParams.append('sort', params.sort);
   }
+  if (params?.limit) {
+    queryParams.append('limit', params.limit.toString());
+  }
+  if (params?.cursor) {
+    queryParams.append('cursor', params.cursor);
+  }
 
   const url = `${API_BASE_URL}/api/calls${queryParams.toString() ? `?${queryParams.toString()}` : ''}`;
   const response = await fetch(url, {
@@ -114,6 +135,17 @@ export async function getCallById(id: string): Promise<CallRecord> {
   return handleResponse<CallRecord>(response);
 }
 
+export async function getCallStatus(id: string): Promise<CallStatusResponse> {
+  const response = await fetch(`${API_BASE_URL}/api/calls/${id}/status`, {
+    method: 'GET',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+  });
+
+  return handleResponse<CallStatusResponse>(response);
+}
+
 export async function getAvailableTags(): Promise<string[]> {
   const response = await fetch(`${API_BASE_URL}/api/calls/tags`, {
     method: 'GET',